@@ -27,13 +27,13 @@ Usage:
 
 import os
 import sys
-from signalwire_agents import AgentBase
 
-def get_required_env_var(name: str) -> str:
-    """Get a required environment variable or exit with error"""
-    value = os.getenv(name)
-    if not value:
-        print(f"Error: Required environment variable {name} is not set")
+def get_required_env_vars(*names: str) -> dict:
+    """Get required environment variables, or exit listing every one that is missing"""
+    values = {name: os.getenv(name) for name in names}
+    missing = [name for name, value in values.items() if not value]
+    if missing:
+        print(f"Error: Required environment variables not set: {', '.join(missing)}")
         print("\nRequired environment variables:")
         print("- SIGNALWIRE_SPACE_NAME: Your SignalWire space name")
         print("- SIGNALWIRE_PROJECT_ID: Your SignalWire project ID")
@@ -45,13 +45,13 @@ def get_required_env_var(name: str) -> str:
         print("- DATASPHERE_TAGS: Comma-separated list of tags to filter by")
         print("- DATASPHERE_LANGUAGE: Language code for search (e.g., 'en')")
         sys.exit(1)
-    return value
+    return values
 
 def parse_tags(tags_str: str) -> list:
     """Parse comma-separated tags string into list"""
     if not tags_str:
         return None
-    return [tag.strip() for tag in tags_str.split(',') if tag.strip()]
+    return [tag for tag in (part.strip() for part in tags_str.split(',')) if tag]
 
 def main():
     print("DataSphere Serverless Environment Demo")
@@ -59,10 +59,12 @@ def main():
     
     # Get required environment variables
     print("Loading configuration from environment variables...")
-    space_name = get_required_env_var('SIGNALWIRE_SPACE_NAME')
-    project_id = get_required_env_var('SIGNALWIRE_PROJECT_ID')
-    token = get_required_env_var('SIGNALWIRE_TOKEN')
-    document_id = get_required_env_var('DATASPHERE_DOCUMENT_ID')
+    space_name, project_id, token, document_id = get_required_env_vars(
+        'SIGNALWIRE_SPACE_NAME',
+        'SIGNALWIRE_PROJECT_ID',
+        'SIGNALWIRE_TOKEN',
+        'DATASPHERE_DOCUMENT_ID'
+    ).values()
     
     # Get optional environment variables with defaults
     count = int(os.getenv('DATASPHERE_COUNT', '3'))
@@ -82,6 +84,10 @@ def main():
     if tags:
         print(f"✓ Tags: {', '.join(tags)}")
     
+    # Import the SDK only once the configuration is known to be complete,
+    # so a missing variable is reported without loading FastAPI first
+    from signalwire_agents import AgentBase
+    
     # Create agent
     agent = AgentBase("DataSphere Knowledge Assistant", route="/datasphere-env-demo")
     
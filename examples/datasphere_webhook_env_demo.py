@@ -51,7 +51,7 @@ def parse_tags(tags_str: str) -> list:
     """Parse comma-separated tags string into list"""
     if not tags_str:
         return None
-    return [tag.strip() for tag in tags_str.split(',') if tag.strip()]
+    return [tag for tag in (part.strip() for part in tags_str.split(',')) if tag]
 
 def main():
     print("DataSphere Webhook Environment Demo")
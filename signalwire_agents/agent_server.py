@@ -24,7 +24,9 @@ except ImportError:
     )
 
 from signalwire_agents.core.agent_base import AgentBase
-from signalwire_agents.core.swml_service import SWMLService
+from signalwire_agents.core.swml_service import (
+    SWMLService, _json_loads, _json_response_class, _server_lifespan, _uvicorn_options
+)
 from signalwire_agents.core.logging_config import get_logger, get_execution_mode
 
 
@@ -62,7 +64,9 @@ class AgentServer:
             title="SignalWire AI Agents",
             description="Hosted SignalWire AI Agents",
             version="0.1.2",
-            redirect_slashes=False
+            redirect_slashes=False,
+            default_response_class=_json_response_class,
+            lifespan=_server_lifespan
         )
         
         # Keep track of registered agents
@@ -336,7 +340,6 @@ class AgentServer:
         """Handle CGI request using same routing logic as server"""
         import os
         import sys
-        import json
         
         # Get PATH_INFO to determine routing
         path_info = os.getenv('PATH_INFO', '').strip('/')
@@ -372,7 +375,7 @@ class AgentServer:
                         if content_length:
                             raw_data = sys.stdin.buffer.read(int(content_length))
                             try:
-                                post_data = json.loads(raw_data.decode('utf-8'))
+                                post_data = _json_loads(raw_data)
                             except:
                                 post_data = {}
                         else:
@@ -395,7 +398,7 @@ class AgentServer:
                         if content_length:
                             raw_data = sys.stdin.buffer.read(int(content_length))
                             try:
-                                post_data = json.loads(raw_data.decode('utf-8'))
+                                post_data = _json_loads(raw_data)
                             except:
                                 post_data = {}
                         else:
@@ -467,7 +470,7 @@ class AgentServer:
                         post_data = {}
                         if event and 'body' in event and event['body']:
                             try:
-                                post_data = json.loads(event['body'])
+                                post_data = _json_loads(event['body'])
                             except:
                                 pass
                         
@@ -623,14 +626,16 @@ class AgentServer:
                 port=port,
                 log_level=self.log_level,
                 ssl_certfile=ssl_cert_path,
-                ssl_keyfile=ssl_key_path
+                ssl_keyfile=ssl_key_path,
+                **_uvicorn_options()
             )
         else:
             uvicorn.run(
                 self.app,
                 host=host,
                 port=port,
-                log_level=self.log_level
+                log_level=self.log_level,
+                **_uvicorn_options()
             )
 
     def register_global_routing_callback(self, callback_fn: Callable[[Request, Dict[str, Any]], Optional[str]], 
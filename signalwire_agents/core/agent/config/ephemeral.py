@@ -128,7 +128,8 @@ class EphemeralAgentConfig:
     def set_native_functions(self, function_names: List[str]) -> 'EphemeralAgentConfig':
         """Set native functions"""
         if function_names and isinstance(function_names, list):
-            self._native_functions = [name for name in function_names if isinstance(name, str)]
+            # Drop duplicates, keeping the first occurrence of each name
+            self._native_functions = list(dict.fromkeys(name for name in function_names if isinstance(name, str)))
         return self
     
     def add_function_include(self, url: str, functions: List[str], meta_data: Optional[Dict[str, Any]] = None) -> 'EphemeralAgentConfig':
@@ -15,6 +15,30 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Parameters accepted by add_section, by POM class; inspected once per class
+_add_section_params: Dict[type, frozenset] = {}
+
+
+def _get_add_section_params(pom: Any) -> frozenset:
+    """
+    Get the parameter names accepted by a POM's add_section method.
+    
+    Args:
+        pom: POM object
+        
+    Returns:
+        Set of parameter names, empty if the POM has no add_section
+    """
+    pom_type = type(pom)
+    params = _add_section_params.get(pom_type)
+    if params is None:
+        if hasattr(pom, 'add_section'):
+            params = frozenset(inspect.signature(pom.add_section).parameters)
+        else:
+            params = frozenset()
+        _add_section_params[pom_type] = params
+    return params
+
 
 class PromptManager:
     """Manages prompt building and configuration."""
@@ -155,12 +179,11 @@ class PromptManager:
                 kwargs['bullets'] = bullets
             
             # Add optional parameters if they look supported
-            if hasattr(self.agent.pom, 'add_section'):
-                sig = inspect.signature(self.agent.pom.add_section)
-                if 'numbered' in sig.parameters:
-                    kwargs['numbered'] = numbered
-                if 'numberedBullets' in sig.parameters:
-                    kwargs['numberedBullets'] = numbered_bullets
+            params = _get_add_section_params(self.agent.pom)
+            if 'numbered' in params:
+                kwargs['numbered'] = numbered
+            if 'numberedBullets' in params:
+                kwargs['numberedBullets'] = numbered_bullets
             
             # Create the section
             section = self.agent.pom.add_section(**kwargs)
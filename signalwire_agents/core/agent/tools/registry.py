@@ -9,9 +9,10 @@ See LICENSE file in the project root for full license information.
 
 """Tool registration and management."""
 
-from typing import Dict, Any, Optional, List, Callable, Union
+from typing import Dict, Any, Optional, List, Callable, Union, Tuple
 import inspect
 import logging
+import sys
 
 from signalwire_agents.core.swaig_function import SWAIGFunction
 
@@ -31,6 +32,27 @@ class ToolRegistry:
         self.agent = agent
         self._swaig_functions = {}
         self._class_decorated_tools = []
+        
+        # Registered functions in registration order, kept in step with
+        # _swaig_functions so define_tools() never has to build a list
+        self._function_list = []
+        
+        # Derived from _swaig_functions and rebuilt lazily after changes
+        self._swaig_entries = {}
+        self._swaig_entry_list = None
+        
+        # Locally executable functions by name, kept in step with _swaig_functions
+        self._handler_table = {}
+        
+        # Names of functions whose calls need a valid token (secure
+        # SWAIGFunctions and raw function dicts)
+        self._secure_functions = set()
+    
+    def _invalidate(self) -> None:
+        """Drop everything derived from the registered functions."""
+        self._swaig_entries = {}
+        self._swaig_entry_list = None
+        self.agent._invalidate_swml_template()
     
     def define_tool(
         self, 
@@ -61,8 +83,9 @@ class ToolRegistry:
         """
         if name in self._swaig_functions:
             raise ValueError(f"Tool with name '{name}' already exists")
-            
-        self._swaig_functions[name] = SWAIGFunction(
+        
+        name = sys.intern(name)
+        swaig_function = SWAIGFunction(
             name=name,
             description=description,
             parameters=parameters,
@@ -72,9 +95,55 @@ class ToolRegistry:
             webhook_url=webhook_url,
             **swaig_fields
         )
-        
+        self._add_functions([swaig_function])
         logger.debug(f"Defined tool: {name}")
     
+    def define_tools_bulk(self, specs: List[Dict[str, Any]]) -> None:
+        """
+        Define several SWAIG functions at once.
+        
+        Either all of the functions are registered or, if any name is taken
+        or repeated, none are.
+        
+        Args:
+            specs: List of define_tool keyword argument dicts (secure
+                defaults to True, as in define_tool)
+            
+        Raises:
+            ValueError: If a tool name already exists or appears twice
+        """
+        names = [spec["name"] for spec in specs]
+        taken = set(names) & self._swaig_functions.keys()
+        if taken:
+            raise ValueError(f"Tool with name '{sorted(taken)[0]}' already exists")
+        if len(set(names)) != len(names):
+            raise ValueError("Tool names must be unique")
+        
+        swaig_functions = [
+            SWAIGFunction(**{"secure": True, **spec, "name": sys.intern(spec["name"])})
+            for spec in specs
+        ]
+        self._add_functions(swaig_functions)
+        logger.debug(f"Defined tools: {names}")
+    
+    def _add_functions(self, swaig_functions: List[SWAIGFunction]) -> None:
+        """
+        Register SWAIGFunction objects whose names are known to be free.
+        
+        Args:
+            swaig_functions: Functions to register, in order
+        """
+        for swaig_function in swaig_functions:
+            name = swaig_function.name
+            self._swaig_functions[name] = swaig_function
+            if not swaig_function.webhook_url:
+                self._handler_table[name] = swaig_function
+            if swaig_function.secure:
+                self._secure_functions.add(name)
+        self._function_list.extend(swaig_functions)
+        
+        self._invalidate()
+    
     def register_swaig_function(self, function_dict: Dict[str, Any]) -> None:
         """
         Register a raw SWAIG function dictionary (e.g., from DataMap.to_swaig_function()).
@@ -94,10 +163,65 @@ class ToolRegistry:
         
         # Store the raw function dictionary for data_map tools
         # These don't have handlers since they execute on SignalWire's server
+        function_name = sys.intern(function_name)
         self._swaig_functions[function_name] = function_dict
+        self._function_list.append(function_dict)
+        self._secure_functions.add(function_name)
         
+        self._invalidate()
         logger.debug(f"Registered SWAIG function: {function_name}")
     
+    @staticmethod
+    def _get_class_decorated_tools(cls) -> List[Tuple[Callable, str, Dict[str, Any]]]:
+        """
+        Get the tools defined with @AgentBase.tool on a class.
+        
+        The class is scanned once and the result stored on it, so later
+        instances only have to bind and register the methods. AgentBase
+        subclasses are scanned when they are defined.
+        
+        Args:
+            cls: Agent class
+            
+        Returns:
+            List of (unbound method, tool name, define_tool keyword arguments)
+        """
+        tools = cls.__dict__.get('_class_decorated_tools_cache')
+        if tools is not None:
+            return tools
+        
+        # Collect the class attributes from the class dicts, base classes
+        # first so that overrides win; this avoids a getattr per attribute
+        attrs = {}
+        for klass in reversed(cls.__mro__):
+            attrs.update(klass.__dict__)
+        
+        tools = []
+        # Loop through the attributes in name order, as dir() would
+        for name in sorted(attrs):
+            attr = attrs[name]
+            
+            # Check if it's a method decorated with @AgentBase.tool
+            if inspect.isfunction(attr) and getattr(attr, "_is_tool", False):
+                # Extract tool information
+                tool_name = getattr(attr, "_tool_name", name)
+                tool_params = getattr(attr, "_tool_params", {})
+                
+                # Extract known parameters and pass through the rest as swaig_fields
+                tool_params_copy = tool_params.copy()
+                kwargs = {
+                    "description": tool_params_copy.pop("description", attr.__doc__ or f"Function {tool_name}"),
+                    "parameters": tool_params_copy.pop("parameters", {}),
+                    "secure": tool_params_copy.pop("secure", True),
+                    "fillers": tool_params_copy.pop("fillers", None),
+                    "webhook_url": tool_params_copy.pop("webhook_url", None),
+                    **tool_params_copy  # Pass through any additional swaig_fields
+                }
+                tools.append((attr, tool_name, kwargs))
+        
+        cls._class_decorated_tools_cache = tools
+        return tools
+    
     def register_class_decorated_tools(self) -> None:
         """
         Register tools defined with @AgentBase.tool class decorator.
@@ -108,39 +232,19 @@ class ToolRegistry:
         # Get the class of this instance
         cls = self.agent.__class__
         
-        # Loop through all attributes in the class
-        for name in dir(cls):
-            # Get the attribute
-            attr = getattr(cls, name)
-            
-            # Check if it's a method decorated with @AgentBase.tool
-            if inspect.ismethod(attr) or inspect.isfunction(attr):
-                if hasattr(attr, "_is_tool") and getattr(attr, "_is_tool", False):
-                    # Extract tool information
-                    tool_name = getattr(attr, "_tool_name", name)
-                    tool_params = getattr(attr, "_tool_params", {})
-                    
-                    # Extract known parameters and pass through the rest as swaig_fields
-                    tool_params_copy = tool_params.copy()
-                    description = tool_params_copy.pop("description", attr.__doc__ or f"Function {tool_name}")
-                    parameters = tool_params_copy.pop("parameters", {})
-                    secure = tool_params_copy.pop("secure", True)
-                    fillers = tool_params_copy.pop("fillers", None)
-                    webhook_url = tool_params_copy.pop("webhook_url", None)
-                    
-                    # Register the tool with any remaining params as swaig_fields
-                    self.define_tool(
-                        name=tool_name,
-                        description=description,
-                        parameters=parameters,
-                        handler=attr.__get__(self.agent, cls),  # Bind the method to this instance
-                        secure=secure,
-                        fillers=fillers,
-                        webhook_url=webhook_url,
-                        **tool_params_copy  # Pass through any additional swaig_fields
-                    )
-                    
-                    logger.debug(f"Registered class-decorated tool: {tool_name}")
+        tools = self._get_class_decorated_tools(cls)
+        if not tools:
+            return
+        
+        # Register all tools in one batch, with any remaining params as swaig_fields
+        self.define_tools_bulk([
+            {
+                "name": tool_name,
+                "handler": attr.__get__(self.agent, cls),  # Bind the method to this instance
+                **kwargs
+            }
+            for attr, tool_name, kwargs in tools
+        ])
     
     def get_function(self, name: str) -> Optional[Union[SWAIGFunction, Dict[str, Any]]]:
         """
@@ -154,6 +258,110 @@ class ToolRegistry:
         """
         return self._swaig_functions.get(name)
     
+    def get_handler(self, name: str) -> Optional[SWAIGFunction]:
+        """
+        Get a function that is executed locally by this agent.
+        
+        Args:
+            name: Function name
+            
+        Returns:
+            SWAIGFunction instance, or None for unknown, data_map and external webhook functions
+        """
+        return self._handler_table.get(name)
+    
+    def is_secure(self, name: str) -> bool:
+        """
+        Check whether calls to a registered function need a valid token.
+        
+        Args:
+            name: Function name
+            
+        Returns:
+            True for secure functions and raw function dicts, False for
+            functions registered with secure=False or not registered at all
+        """
+        return name in self._secure_functions
+    
+    def get_function_list(self) -> List[Union[SWAIGFunction, Dict[str, Any]]]:
+        """
+        Get all registered functions in registration order.
+        
+        The list is updated in place on registration and removal, so callers
+        must not modify it.
+        
+        Returns:
+            List of SWAIGFunction instances and raw function dicts
+        """
+        return self._function_list
+    
+    def get_swaig_entries(self) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        """
+        Get the SWML entries for all registered functions in registration order.
+        
+        The entries and the functions that need a per-call token are kept
+        side by side, so a render without a call ID can use the entries list
+        as-is and a render with one only visits the token slots. Cached until
+        the next registration or removal, like get_swaig_entry().
+        
+        Returns:
+            Tuple of (static SWAIG entries, (index, function name) of each
+            local secure function that needs a per-call token)
+        """
+        if self._swaig_entry_list is None:
+            entries = []
+            token_slots = []
+            for name, func in self._swaig_functions.items():
+                if not isinstance(func, dict) and func.secure and not func.webhook_url:
+                    token_slots.append((len(entries), name))
+                entries.append(self.get_swaig_entry(name))
+            self._swaig_entry_list = (entries, token_slots)
+        return self._swaig_entry_list
+    
+    def get_swaig_entry(self, name: str) -> Dict[str, Any]:
+        """
+        Get the token-independent SWML entry for a registered function.
+        
+        The entry holds everything except a per-call web_hook_url and is
+        cached until the next registration or removal, so callers must copy
+        it before adding fields.
+        
+        Args:
+            name: Function name
+            
+        Returns:
+            SWAIG function definition for the functions array
+        """
+        entry = self._swaig_entries.get(name)
+        if entry is not None:
+            return entry
+        
+        func = self._swaig_functions[name]
+        if isinstance(func, dict):
+            # For raw dictionaries (DataMap functions), use the entire dictionary as-is
+            # This preserves data_map and any other special fields
+            entry = func.copy()
+            entry["function"] = name
+        else:
+            entry = {
+                "function": name,
+                "description": func.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": func.parameters
+                }
+            }
+            
+            if func.fillers:
+                entry["fillers"] = func.fillers
+            
+            # External webhook functions always use the provided URL
+            if func.webhook_url:
+                entry["web_hook_url"] = func.webhook_url
+        
+        self._swaig_entries[name] = entry
+        return entry
+    
     def get_all_functions(self) -> Dict[str, Union[SWAIGFunction, Dict[str, Any]]]:
         """
         Get all registered functions.
@@ -186,7 +394,10 @@ class ToolRegistry:
             True if removed, False if not found
         """
         if name in self._swaig_functions:
-            del self._swaig_functions[name]
+            self._function_list.remove(self._swaig_functions.pop(name))
+            self._handler_table.pop(name, None)
+            self._secure_functions.discard(name)
+            self._invalidate()
             logger.debug(f"Removed function: {name}")
             return True
         return False
\ No newline at end of file
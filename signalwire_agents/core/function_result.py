@@ -68,6 +68,9 @@ class SwaigFunctionResult:
             .connect("sales@company.com", final=False, from_addr="+15559876543")
         )
     """
+    # No per-instance __dict__; __weakref__ keeps weak references working
+    __slots__ = ("response", "action", "post_process", "__weakref__")
+    
     def __init__(self, response: Optional[str] = None, post_process: bool = False):
         """
         Initialize a new SWAIG function result
@@ -1176,25 +1179,17 @@ class SwaigFunctionResult:
         Returns:
             Dictionary in SWAIG function response format
         """
-        # Create the result object
-        result = {}
+        action = self.action
         
-        # Add response if present
-        if self.response:
-            result["response"] = self.response
-            
-        # Add action if present
-        if self.action:
-            result["action"] = self.action
-            
-        # Add post_process if enabled and we have actions
-        # (post_process only matters when there are actions to execute)
-        if self.post_process and self.action:
+        # Without actions only the response is sent, falling back to a
+        # default so the result is never empty
+        if not action:
+            return {"response": self.response or "Action completed."}
+        
+        result = {"response": self.response, "action": action} if self.response else {"action": action}
+        
+        # post_process only matters when there are actions to execute
+        if self.post_process:
             result["post_process"] = True
             
-        # Ensure we have at least one of response or action
-        if not result:
-            # Default response if neither is present
-            result["response"] = "Action completed."
-            
         return result
@@ -63,28 +63,29 @@ class StructuredLoggerWrapper:
     
     def debug(self, message: str, **kwargs) -> None:
         """Log debug message with optional structured data"""
-        formatted = self._format_structured_message(message, **kwargs)
-        self._logger.debug(formatted)
+        # Skip formatting the message if the level is disabled
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(self._format_structured_message(message, **kwargs))
     
     def info(self, message: str, **kwargs) -> None:
         """Log info message with optional structured data"""
-        formatted = self._format_structured_message(message, **kwargs)
-        self._logger.info(formatted)
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(self._format_structured_message(message, **kwargs))
     
     def warning(self, message: str, **kwargs) -> None:
         """Log warning message with optional structured data"""
-        formatted = self._format_structured_message(message, **kwargs)
-        self._logger.warning(formatted)
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._logger.warning(self._format_structured_message(message, **kwargs))
     
     def error(self, message: str, **kwargs) -> None:
         """Log error message with optional structured data"""
-        formatted = self._format_structured_message(message, **kwargs)
-        self._logger.error(formatted)
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._logger.error(self._format_structured_message(message, **kwargs))
     
     def critical(self, message: str, **kwargs) -> None:
         """Log critical message with optional structured data"""
-        formatted = self._format_structured_message(message, **kwargs)
-        self._logger.critical(formatted)
+        if self._logger.isEnabledFor(logging.CRITICAL):
+            self._logger.critical(self._format_structured_message(message, **kwargs))
     
     # Also support the 'warn' alias
     warn = warning
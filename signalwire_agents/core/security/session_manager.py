@@ -11,12 +11,13 @@ See LICENSE file in the project root for full license information.
 Session manager for handling call sessions and security tokens
 """
 
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, List, Tuple
 import secrets
 import time
 import hmac
 import hashlib
 import base64
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 
@@ -27,7 +28,17 @@ class SessionManager:
     This implementation is completely stateless - it does not track call sessions
     or store any information in memory. All validation is done using cryptographic
     signatures with the tokens containing all necessary information.
+    
+    The only state kept is a small, bounded cache of recent validation results,
+    since a call typically presents the same token for several function calls.
     """
+    
+    # Maximum number of validation results to remember
+    TOKEN_CACHE_SIZE = 4096
+    
+    # Seconds to remember a failed validation
+    NEGATIVE_CACHE_TTL = 5
+    
     def __init__(self, token_expiry_secs: int = 3600, secret_key: Optional[str] = None):
         """
         Initialize the session manager
@@ -39,6 +50,34 @@ class SessionManager:
         self.token_expiry_secs = token_expiry_secs
         # Use provided secret key or generate a secure one
         self.secret_key = secret_key or secrets.token_hex(32)
+        
+        # HMAC keyed with secret_key, copied per signature so the key is only
+        # processed once; rebuilt if secret_key is replaced
+        self._signer = None
+        self._signer_key = None
+        
+        # Recent validation results: (call_id, function_name, token) -> (valid, cached_until)
+        self._token_cache = OrderedDict()
+        self._token_cache_ttl = max(1, min(30, token_expiry_secs // 2))
+    
+    def _sign(self, message: str) -> str:
+        """
+        Sign a token message with the secret key
+        
+        Args:
+            message: Message to sign
+            
+        Returns:
+            First 16 hex characters of the HMAC-SHA256 signature
+        """
+        if self._signer_key is not self.secret_key:
+            self._signer = hmac.new(self.secret_key.encode(), digestmod=hashlib.sha256)
+            self._signer_key = self.secret_key
+        
+        signer = self._signer.copy()
+        signer.update(message.encode())
+        # Use first 16 chars of signature for shorter tokens
+        return signer.hexdigest()[:16]
     
     def create_session(self, call_id: Optional[str] = None) -> str:
         """
@@ -67,19 +106,42 @@ class SessionManager:
         Returns:
             A secure token
         """
-        # Create token parts
         expiry = int(time.time()) + self.token_expiry_secs
+        return self._make_token(function_name, call_id, expiry)
+    
+    def generate_tokens(self, function_names: List[str], call_id: str) -> Dict[str, str]:
+        """
+        Generate tokens for several functions of the same call at once
+        
+        Args:
+            function_names: Names of the functions to generate tokens for
+            call_id: Call session ID
+            
+        Returns:
+            Mapping of function name to its token
+        """
+        expiry = int(time.time()) + self.token_expiry_secs
+        return {name: self._make_token(name, call_id, expiry) for name in function_names}
+    
+    def _make_token(self, function_name: str, call_id: str, expiry: int) -> str:
+        """
+        Build and sign a token
+        
+        Args:
+            function_name: Name of the function the token is for
+            call_id: Call session ID
+            expiry: Expiry timestamp
+            
+        Returns:
+            A secure token
+        """
         nonce = secrets.token_hex(4)
         
         # Create the message to sign
         message = f"{call_id}:{function_name}:{expiry}:{nonce}"
         
         # Sign the message
-        signature = hmac.new(
-            self.secret_key.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()[:16]  # Use first 16 chars of signature for shorter tokens
+        signature = self._sign(message)
         
         # Combine all parts into the token
         token = f"{call_id}.{function_name}.{expiry}.{nonce}.{signature}"
@@ -105,6 +167,9 @@ class SessionManager:
         """
         Validate a function call token
         
+        Results are cached briefly, and a cached success never outlives the
+        token's own expiry.
+        
         Args:
             call_id: Call session ID
             function_name: Name of the function being called
@@ -113,6 +178,43 @@ class SessionManager:
         Returns:
             True if valid, False otherwise
         """
+        key = (call_id, function_name, token)
+        now = time.time()
+        
+        cached = self._token_cache.get(key)
+        if cached is not None:
+            valid, cached_until = cached
+            if cached_until > now:
+                return valid
+            self._token_cache.pop(key, None)
+        
+        valid, expiry = self._check_token(call_id, function_name, token)
+        if valid:
+            cached_until = min(now + self._token_cache_ttl, expiry)
+        else:
+            cached_until = now + min(self.NEGATIVE_CACHE_TTL, self._token_cache_ttl)
+        
+        self._token_cache[key] = (valid, cached_until)
+        if len(self._token_cache) > self.TOKEN_CACHE_SIZE:
+            try:
+                self._token_cache.popitem(last=False)
+            except KeyError:
+                pass
+        
+        return valid
+    
+    def _check_token(self, call_id: str, function_name: str, token: str) -> Tuple[bool, int]:
+        """
+        Verify a function call token without consulting the cache
+        
+        Args:
+            call_id: Call session ID
+            function_name: Name of the function being called
+            token: Token to validate
+            
+        Returns:
+            Tuple of (is_valid, token expiry timestamp or 0 if unknown)
+        """
         try:
             # Decode the token
             decoded_token = base64.urlsafe_b64decode(token.encode()).decode()
@@ -120,7 +222,7 @@ class SessionManager:
             # Split the token parts
             parts = decoded_token.split('.')
             if len(parts) != 5:
-                return False
+                return False, 0
                 
             token_call_id, token_function, token_expiry, token_nonce, token_signature = parts
             
@@ -131,33 +233,29 @@ class SessionManager:
             
             # Verify the function matches
             if token_function != function_name:
-                return False
+                return False, 0
                 
             # Check if the token has expired
             expiry = int(token_expiry)
             if expiry < time.time():
-                return False
+                return False, expiry
                 
-            # Recreate the message and verify the signature
+            # Recreate the message and verify the signature in constant time
             message = f"{token_call_id}:{token_function}:{token_expiry}:{token_nonce}"
-            expected_signature = hmac.new(
-                self.secret_key.encode(),
-                message.encode(),
-                hashlib.sha256
-            ).hexdigest()[:16]
+            expected_signature = self._sign(message)
             
-            if token_signature != expected_signature:
-                return False
+            if not hmac.compare_digest(token_signature.encode(), expected_signature.encode()):
+                return False, expiry
                 
             # Finally, verify the call_id matches unless we're in special case
             # This check is done last to ensure the token is otherwise valid
             if token_call_id != call_id:
-                return False
+                return False, expiry
                 
-            return True
+            return True, expiry
         except Exception:
             # Any exception during validation means the token is invalid
-            return False
+            return False, 0
     
     # Alias for validate_token to maintain backward compatibility
     def validate_tool_token(self, function_name: str, token: str, call_id: str) -> bool:
@@ -22,6 +22,13 @@ class SWAIGFunction:
     """
     Represents a SWAIG function for AI integration
     """
+    # No per-instance __dict__; __weakref__ keeps weak references working
+    __slots__ = (
+        "name", "handler", "description", "parameters", "secure", "fillers",
+        "webhook_url", "extra_swaig_fields", "is_external", "_is_async",
+        "__weakref__"
+    )
+    
     def __init__(
         self, 
         name: str, 
@@ -58,6 +65,9 @@ class SWAIGFunction:
         # Mark as external if webhook_url is provided
         self.is_external = webhook_url is not None
         
+        # Resolve once whether the handler must be awaited
+        self._is_async = inspect.iscoroutinefunction(handler)
+        
     def _ensure_parameter_structure(self) -> Dict:
         """
         Ensure the parameters are correctly structured for SWML
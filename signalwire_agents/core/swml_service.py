@@ -14,15 +14,16 @@ Base SWML Service for SignalWire Agents
 """
 
 import os
-import inspect
 import json
 import secrets
 import base64
+import hmac
 import logging
 import sys
 import types
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
 from typing import Dict, List, Any, Optional, Union, Callable, Tuple, Type
-from urllib.parse import urlparse
 
 # Import centralized logging system
 from signalwire_agents.core.logging_config import get_logger
@@ -31,18 +32,117 @@ from signalwire_agents.core.logging_config import get_logger
 logger = get_logger("swml_service")
 
 try:
-    import fastapi
-    from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Body, Request, Response
-    from fastapi.security import HTTPBasic, HTTPBasicCredentials
-    from pydantic import BaseModel
+    import anyio.to_thread
+    from fastapi import FastAPI, APIRouter, HTTPException, Request, Response
+    from fastapi.responses import JSONResponse, ORJSONResponse
 except ImportError:
     raise ImportError(
         "fastapi is required. Install it with: pip install fastapi"
     )
 
+# orjson is optional; when installed it is used for webhook request parsing
+# and JSON responses, otherwise the stdlib json module is used
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# uvloop and httptools are optional; when installed uvicorn is run on the
+# libuv event loop and the C HTTP parser instead of asyncio and h11
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import httptools
+except ImportError:
+    httptools = None
+
 from signalwire_agents.utils.schema_utils import SchemaUtils
 from signalwire_agents.core.swml_handler import VerbHandlerRegistry, SWMLVerbHandler
 
+# JSON parser and response class for the SWML and webhook endpoints
+_json_loads = orjson.loads if orjson is not None else json.loads
+_json_response_class = ORJSONResponse if orjson is not None else JSONResponse
+
+
+# Default number of worker threads for sync SWAIG handlers and full SWML
+# builds; anyio's default of 40 is easily exhausted by slow handlers under load
+_DEFAULT_THREADPOOL_SIZE = 200
+
+
+def _threadpool_size() -> int:
+    """
+    Get the worker thread limit from SWML_THREADPOOL_SIZE
+    
+    Read when a server starts rather than at import, so a bad value doesn't
+    break CLI or serverless use of the package.
+    
+    Returns:
+        The configured limit, or the default if it is unset or not a
+        positive integer
+    """
+    value = os.environ.get('SWML_THREADPOOL_SIZE')
+    if value is None:
+        return _DEFAULT_THREADPOOL_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size < 1:
+        logger.warning("invalid_threadpool_size", value=value, default=_DEFAULT_THREADPOOL_SIZE)
+        return _DEFAULT_THREADPOOL_SIZE
+    return size
+
+
+@asynccontextmanager
+async def _server_lifespan(app: FastAPI):
+    """
+    Lifespan for the FastAPI apps created by the SDK, sizing the threadpool
+    
+    The limiter is anyio's process-wide default, so this sets the limit for
+    every app and run_in_threadpool caller in the process, not just this
+    app. Handlers registered with app.on_event("startup") / ("shutdown")
+    are run as they are without a custom lifespan.
+    
+    Args:
+        app: The FastAPI application being started
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = _threadpool_size()
+    await app.router.startup()
+    yield
+    await app.router.shutdown()
+
+
+def _uvicorn_options() -> Dict[str, str]:
+    """
+    Get the uvicorn event loop and HTTP protocol to serve with
+    
+    Returns:
+        Keyword arguments for uvicorn.run selecting uvloop and httptools
+        when they are installed, and asyncio and h11 otherwise
+    """
+    return {
+        "loop": "uvloop" if uvloop is not None else "asyncio",
+        "http": "httptools" if httptools is not None else "h11"
+    }
+
+
+def _json_dumps(obj: Any) -> str:
+    """
+    Serialize an object to a compact JSON string, using orjson when installed
+    
+    Args:
+        obj: The object to serialize
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj)
+
 
 class SWMLService:
     """
@@ -95,6 +195,12 @@ class SWMLService:
         self._proxy_detection_done = False
         self._proxy_debug = os.environ.get('SWML_PROXY_DEBUG', '').lower() in ('true', '1', 'yes')
         
+        # Webhook base URL, computed on first use (see _get_webhook_base), and
+        # the endpoint URLs derived from it
+        self._webhook_base = None
+        self._webhook_base_key = None
+        self._webhook_urls = {}
+        
         # Initialize logger for this instance
         self.log = logger.bind(service=name)
         self.log.info("service_initializing", route=self.route, host=host, port=port)
@@ -117,6 +223,16 @@ class SWMLService:
                 password = secrets.token_urlsafe(16)
                 self._basic_auth = (username, password)
         
+        # Credential source, detected again only if _basic_auth is replaced
+        self._auth_source = None
+        self._auth_source_for = None
+        
+        # Precompute the Authorization header we expect, so request checks
+        # are a single comparison instead of a decode and split
+        self._expected_auth_header = None
+        self._expected_auth_for = None
+        self._get_expected_auth_header()
+        
         # Find the schema file if not provided
         if schema_path is None:
             schema_path = self._find_schema_path()
@@ -525,7 +641,7 @@ class SWMLService:
         Returns:
             The current SWML document as a JSON string
         """
-        return json.dumps(self._current_document)
+        return _json_dumps(self._current_document)
     
     def register_verb_handler(self, handler: SWMLVerbHandler) -> None:
         """
@@ -546,8 +662,7 @@ class SWMLService:
         router = APIRouter(redirect_slashes=False)
         
         # Root endpoint with and without trailing slash
-        @router.get("/")
-        @router.post("/")
+        @router.api_route("/", methods=["GET", "POST"])
         async def handle_root(request: Request, response: Response):
             """Handle requests to the root endpoint"""
             return await self._handle_request(request, response)
@@ -563,10 +678,8 @@ class SWMLService:
                 path = callback_path.rstrip("/")
                 path_with_slash = f"{path}/"
                 
-                @router.get(path)
-                @router.get(path_with_slash)
-                @router.post(path)
-                @router.post(path_with_slash)
+                @router.api_route(path, methods=["GET", "POST"])
+                @router.api_route(path_with_slash, methods=["GET", "POST"], include_in_schema=False)
                 async def handle_callback(request: Request, response: Response, cb_path=callback_path):
                     """Handle requests to callback endpoints"""
                     # Store the callback path in the request state
@@ -659,8 +772,11 @@ class SWMLService:
             
         # Check auth
         if not self._check_basic_auth(request):
-            response.headers["WWW-Authenticate"] = "Basic"
-            return HTTPException(status_code=401, detail="Unauthorized")
+            raise HTTPException(
+                status_code=401,
+                detail="Unauthorized",
+                headers={"WWW-Authenticate": "Basic"}
+            )
         
         # Get callback path from request state
         callback_path = getattr(request.state, "callback_path", None)
@@ -671,7 +787,7 @@ class SWMLService:
             try:
                 raw_body = await request.body()
                 if raw_body:
-                    body = await request.json()
+                    body = _json_loads(raw_body)
                     
                     # Check if this is a callback path and we have a callback registered for it
                     if callback_path and hasattr(self, '_routing_callbacks') and callback_path in self._routing_callbacks:
@@ -703,17 +819,16 @@ class SWMLService:
         
         # Apply any modifications if needed
         if modifications and isinstance(modifications, dict):
-            # Get a copy of the current document
-            document = self.get_document()
+            # Get a copy of the current document, so the modifications only
+            # apply to this response
+            document = self.get_document().copy()
             
             # Apply modifications (simplified implementation)
             # In a real implementation, you might want a more sophisticated merge strategy
-            for key, value in modifications.items():
-                if key in document:
-                    document[key] = value
+            document.update((key, value) for key, value in modifications.items() if key in document)
             
             # Create a new document with the modifications
-            modified_doc = json.dumps(document)
+            modified_doc = _json_dumps(document)
             return Response(content=modified_doc, media_type="application/json")
         
         # Get the current SWML document
@@ -778,7 +893,11 @@ class SWMLService:
         
         if self._app is None:
             # Use redirect_slashes=False to be consistent with AgentBase
-            app = FastAPI(redirect_slashes=False)
+            app = FastAPI(
+                redirect_slashes=False,
+                default_response_class=_json_response_class,
+                lifespan=_server_lifespan
+            )
             router = self.as_router()
             
             # Normalize the route to ensure it starts with a slash and doesn't end with one
@@ -790,8 +909,7 @@ class SWMLService:
             
             # Add a catch-all route handler that will handle both /path and /path/ formats
             # This provides the same behavior without using a trailing slash in the prefix
-            @app.get("/{full_path:path}")
-            @app.post("/{full_path:path}")
+            @app.api_route("/{full_path:path}", methods=["GET", "POST"], include_in_schema=False)
             async def handle_all_routes(request: Request, response: Response, full_path: str):
                 # Get our route path without leading slash for comparison
                 route_path = normalized_route.lstrip("/")
@@ -830,10 +948,11 @@ class SWMLService:
                 return {"error": "Path not found"}
             
             # Log all routes for debugging
-            self.log.debug("registered_routes", service=self.name)
-            for route in app.routes:
-                if hasattr(route, "path"):
-                    self.log.debug("route_registered", path=route.path)
+            if self.log.isEnabledFor(logging.DEBUG):
+                self.log.debug("registered_routes", service=self.name)
+                for route in app.routes:
+                    if hasattr(route, "path"):
+                        self.log.debug("route_registered", path=route.path)
             
             self._app = app
         
@@ -880,10 +999,23 @@ class SWMLService:
                 host=host, 
                 port=port,
                 ssl_certfile=ssl_cert_path,
-                ssl_keyfile=ssl_key_path
+                ssl_keyfile=ssl_key_path,
+                **self._get_uvicorn_options()
             )
         else:
-            uvicorn.run(self._app, host=host, port=port)
+            uvicorn.run(self._app, host=host, port=port, **self._get_uvicorn_options())
+    
+    def _get_uvicorn_options(self) -> Dict[str, str]:
+        """
+        Get the uvicorn event loop and HTTP protocol to serve with
+        
+        Returns:
+            Keyword arguments for uvicorn.run selecting uvloop and httptools
+            when they are installed, and asyncio and h11 otherwise
+        """
+        options = _uvicorn_options()
+        self.log.debug("uvicorn_options", threadpool_size=_threadpool_size(), **options)
+        return options
     
     def stop(self) -> None:
         """
@@ -891,6 +1023,47 @@ class SWMLService:
         """
         self._running = False
     
+    def _get_expected_auth_header(self) -> Optional[bytes]:
+        """
+        Get the precomputed Basic credentials for the current username and password
+        
+        The credentials are re-encoded only if they have been replaced since
+        they were last computed.
+        
+        Returns:
+            Expected base64 credentials (the part of the header after the
+            scheme) as bytes, or None if no credentials are set
+        """
+        if self._expected_auth_for is not self._basic_auth:
+            username, password = self._basic_auth
+            if username is None or password is None:
+                self._expected_auth_header = None
+            else:
+                self._expected_auth_header = base64.b64encode(f"{username}:{password}".encode("utf-8"))
+            self._expected_auth_for = self._basic_auth
+        return self._expected_auth_header
+    
+    @staticmethod
+    def _parse_basic_auth_header(auth_header: Optional[str]) -> Optional[str]:
+        """
+        Get the base64 credentials from a Basic Authorization header
+        
+        The scheme is matched case-insensitively and any whitespace may
+        separate it from the credentials.
+        
+        Args:
+            auth_header: Authorization header value, if any
+            
+        Returns:
+            The credentials part of the header, or None if it isn't Basic auth
+        """
+        if not auth_header:
+            return None
+        parts = auth_header.split()
+        if len(parts) != 2 or parts[0].lower() != "basic":
+            return None
+        return parts[1]
+    
     def _check_basic_auth(self, request: Request) -> bool:
         """
         Check if the request has valid basic auth credentials
@@ -901,24 +1074,25 @@ class SWMLService:
         Returns:
             True if auth is valid, False otherwise
         """
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return False
+        return self._check_auth_header(request.headers.get("Authorization"))
+    
+    def _check_auth_header(self, auth_header: Optional[str]) -> bool:
+        """
+        Check the value of a Basic Authorization header
         
-        # Extract the credentials from the header
-        try:
-            scheme, credentials = auth_header.split()
-            if scheme.lower() != "basic":
-                return False
-            
-            decoded = base64.b64decode(credentials).decode("utf-8")
-            username, password = decoded.split(":")
+        Args:
+            auth_header: Authorization header value, if any
             
-            # Compare with our credentials
-            expected_username, expected_password = self._basic_auth
-            return username == expected_username and password == expected_password
-        except Exception:
+        Returns:
+            True if auth is valid, False otherwise
+        """
+        credentials = self._parse_basic_auth_header(auth_header)
+        expected = self._get_expected_auth_header()
+        if credentials is None or expected is None:
             return False
+        
+        # One constant-time compare against the precomputed credentials
+        return hmac.compare_digest(credentials.encode("utf-8"), expected)
     
     def get_basic_auth_credentials(self, include_source: bool = False) -> Union[Tuple[str, str], Tuple[str, str, str]]:
         """
@@ -933,40 +1107,55 @@ class SWMLService:
         username, password = self._basic_auth
         
         if include_source:
-            # Determine source
-            env_user = os.environ.get('SWML_BASIC_AUTH_USER')
-            env_pass = os.environ.get('SWML_BASIC_AUTH_PASSWORD')
-            
-            if env_user and env_pass and env_user == username and env_pass == password:
-                source = "environment"
-            else:
-                source = "auto-generated"
+            # The source only needs detecting again if the credentials were replaced
+            if self._auth_source_for is not self._basic_auth:
+                env_user = os.environ.get('SWML_BASIC_AUTH_USER')
+                env_pass = os.environ.get('SWML_BASIC_AUTH_PASSWORD')
+                
+                if env_user and env_pass and env_user == username and env_pass == password:
+                    self._auth_source = "environment"
+                else:
+                    self._auth_source = "auto-generated"
+                self._auth_source_for = self._basic_auth
                 
-            return username, password, source
+            return username, password, self._auth_source
         
         return username, password
     
         
-    def _build_webhook_url(self, endpoint: str, query_params: Optional[Dict[str, str]] = None) -> str:
+    def _get_webhook_base(self) -> str:
         """
-        Helper method to build webhook URLs consistently
+        Get the base URL for webhooks: scheme, auth credentials, host and route
+        
+        The base only changes when the proxy URL, credentials or server
+        settings change, so it is cached and rebuilt only when one of them has.
         
-        Args:
-            endpoint: The endpoint path (e.g., "swaig", "post_prompt")
-            query_params: Optional query parameters to append
-            
         Returns:
-            Fully constructed webhook URL
+            Webhook base URL without a trailing slash
         """
-        # Base URL construction
-        if hasattr(self, '_proxy_url_base') and getattr(self, '_proxy_url_base', None):
-            # For proxy URLs
+        key = (
+            getattr(self, '_proxy_url_base', None),
+            self._basic_auth,
+            getattr(self, 'ssl_enabled', False),
+            getattr(self, 'domain', None),
+            self.host,
+            self.port,
+            self.route
+        )
+        if getattr(self, '_webhook_base_key', None) == key:
+            return self._webhook_base
+        
+        # Always include auth credentials
+        username, password = self._basic_auth
+        
+        if getattr(self, '_proxy_url_base', None):
+            # For proxy URLs, insert the credentials in front of the host
             base = self._proxy_url_base.rstrip('/')
-            
-            # Always add auth credentials
-            username, password = self._basic_auth
-            url = urlparse(base)
-            base = url._replace(netloc=f"{username}:{password}@{url.netloc}").geturl()
+            scheme, sep, rest = base.partition("://")
+            if sep:
+                base = f"{scheme}://{username}:{password}@{rest}"
+            else:
+                base = f"//{username}:{password}@{base}"
         else:
             # Determine protocol based on SSL settings
             protocol = "https" if getattr(self, 'ssl_enabled', False) else "http"
@@ -984,26 +1173,39 @@ class SWMLService:
                 
                 host_part = f"{host}:{self.port}"
                 
-            # Always include auth credentials
-            username, password = self._basic_auth
             base = f"{protocol}://{username}:{password}@{host_part}"
         
-        # Ensure the endpoint has a trailing slash to prevent redirects
-        if endpoint and not endpoint.endswith('/'):
-            endpoint = f"{endpoint}/"
-            
-        # Simple path - use the route directly with the endpoint
-        path = f"{self.route}/{endpoint}"
+        self._webhook_base = f"{base}{self.route}"
+        self._webhook_base_key = key
+        self._webhook_urls = {}
+        return self._webhook_base
+    
+    def _build_webhook_url(self, endpoint: str, query_params: Optional[Dict[str, str]] = None) -> str:
+        """
+        Helper method to build webhook URLs consistently
+        
+        Args:
+            endpoint: The endpoint path (e.g., "swaig", "post_prompt")
+            query_params: Optional query parameters to append
             
-        # Construct full URL
-        url = f"{base}{path}"
+        Returns:
+            Fully constructed webhook URL
+        """
+        # Construct full URL from the cached base (which includes the route);
+        # endpoint URLs are kept until the base changes
+        base = self._get_webhook_base()
+        url = self._webhook_urls.get(endpoint)
+        if url is None:
+            # Ensure the endpoint has a trailing slash to prevent redirects
+            path = endpoint if not endpoint or endpoint.endswith('/') else f"{endpoint}/"
+            url = f"{base}/{path}"
+            self._webhook_urls[endpoint] = url
         
         # Add query parameters if any (only if they have values)
         if query_params:
             filtered_params = {k: v for k, v in query_params.items() if v}
             if filtered_params:
-                params = "&".join([f"{k}={v}" for k, v in filtered_params.items()])
-                url = f"{url}?{params}"
+                url = f"{url}?{urlencode(filtered_params)}"
             
         return url 
 
@@ -1049,12 +1251,14 @@ class SWMLService:
                 self.log.warning("forwarded_header_parse_error", error=str(e))
         
         # Try to detect from the URL itself for transparent proxies
-        if str(request.url).startswith(("https://", "http://")) and not any(
-            str(request.url).startswith(f"http://{h}") for h in ["localhost", "127.0.0.1", self.host, "0.0.0.0"]
+        request_url = str(request.url)
+        if request_url.startswith(("https://", "http://")) and not any(
+            request_url.startswith(f"http://{h}") for h in ["localhost", "127.0.0.1", self.host, "0.0.0.0"]
         ):
             # This is likely a transparent proxy - extract base URL
-            parsed = urlparse(str(request.url))
-            base_url = f"{parsed.scheme}://{parsed.netloc}"
+            scheme, _, rest = request_url.partition("://")
+            netloc = rest.split("/", 1)[0].split("?", 1)[0]
+            base_url = f"{scheme}://{netloc}"
             self._proxy_url_base = base_url
             self.log.info("proxy_auto_detected", proxy_url_base=base_url,
                         source="request URL (transparent proxy)")
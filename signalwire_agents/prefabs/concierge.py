@@ -120,13 +120,13 @@ class ConciergeAgent(AgentBase):
         )
         
         # Amenities section with details
-        amenities_subsections = []
-        for name, details in self.amenities.items():
-            subsection = {
+        amenities_subsections = [
+            {
                 "title": name.title(),
                 "body": "\n".join([f"{k.title()}: {v}" for k, v in details.items()])
             }
-            amenities_subsections.append(subsection)
+            for name, details in self.amenities.items()
+        ]
             
         self.prompt_add_section("Amenities", 
             body="Information about available amenities:",
@@ -11,7 +11,7 @@ See LICENSE file in the project root for full license information.
 FAQBotAgent - Prefab agent for answering frequently asked questions
 """
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Tuple
 import json
 import os
 
@@ -44,6 +44,14 @@ class FAQBotAgent(AgentBase):
         )
     """
     
+    # Instructions shared by every FAQ bot; suggest_related adds one more
+    _BASE_INSTRUCTIONS: Tuple[str, ...] = (
+        "Compare user questions to your FAQ database and find the best match.",
+        "Provide the answer from the FAQ database for the matching question.",
+        "If no close match exists, politely say you don't have that information.",
+        "Be concise and factual in your responses."
+    )
+    
     def __init__(
         self,
         faqs: List[Dict[str, str]],
@@ -106,12 +114,7 @@ class FAQBotAgent(AgentBase):
         )
         
         # Set up the instructions
-        instructions = [
-            "Compare user questions to your FAQ database and find the best match.",
-            "Provide the answer from the FAQ database for the matching question.",
-            "If no close match exists, politely say you don't have that information.",
-            "Be concise and factual in your responses."
-        ]
+        instructions = list(self._BASE_INSTRUCTIONS)
         
         # Add instruction about suggesting related questions if enabled
         if self.suggest_related:
@@ -135,9 +135,7 @@ class ReceptionistAgent(AgentBase):
         global_data = self._global_data
         departments = global_data.get("departments", [])
         
-        department_bullets = []
-        for dept in departments:
-            department_bullets.append(f"{dept['name']}: {dept['description']}")
+        department_bullets = [f"{dept['name']}: {dept['description']}" for dept in departments]
         
         self.prompt_add_section(
             "Available Departments",
@@ -224,14 +222,12 @@ class ReceptionistAgent(AgentBase):
         )
         
         # Update global data with caller info
-        result.add_actions([
-            {"set_global_data": {
-                "caller_info": {
-                    "name": name,
-                    "reason": reason
-                }
-            }}
-        ])
+        result.add_action("set_global_data", {
+            "caller_info": {
+                "name": name,
+                "reason": reason
+            }
+        })
         
         return result
     
@@ -248,11 +244,7 @@ class ReceptionistAgent(AgentBase):
         departments = global_data.get("departments", [])
         
         # Find the department in the list
-        department = None
-        for dept in departments:
-            if dept["name"] == department_name:
-                department = dept
-                break
+        department = next((dept for dept in departments if dept["name"] == department_name), None)
         
         # If department not found, return error
         if not department:
@@ -108,6 +108,12 @@ class SurveyAgent(AgentBase):
         # Validate questions
         self._validate_questions()
         
+        # Index questions by ID for the tool handlers; the first question
+        # with a given ID wins, as it would when scanning the list
+        self._questions_by_id = {}
+        for question in self.questions:
+            self._questions_by_id.setdefault(question["id"], question)
+        
         # Set up the agent's configuration
         self._setup_survey_agent()
     
@@ -271,11 +277,7 @@ class SurveyAgent(AgentBase):
         response = args.get("response", "")
         
         # Find the question by ID
-        question = None
-        for q in self.questions:
-            if q["id"] == question_id:
-                question = q
-                break
+        question = self._questions_by_id.get(question_id)
                 
         if not question:
             return SwaigFunctionResult(f"Error: Question with ID '{question_id}' not found.")
@@ -343,11 +345,8 @@ class SurveyAgent(AgentBase):
         response = args.get("response", "")
         
         # Find the question by ID for a more informative message
-        question_text = ""
-        for q in self.questions:
-            if q["id"] == question_id:
-                question_text = q["text"]
-                break
+        question = self._questions_by_id.get(question_id)
+        question_text = question["text"] if question else ""
         
         # In a real implementation, you would store this response in a database
         # For this example, we just acknowledge it
@@ -73,9 +73,13 @@ else:
 class SearchService:
     """Local search service with HTTP API"""
     
-    def __init__(self, port: int = 8001, indexes: Dict[str, str] = None):
+    def __init__(self, port: int = 8001, indexes: Dict[str, str] = None,
+                 validate_responses: bool = False):
         self.port = port
         self.indexes = indexes or {}
+        # Search results are built from our own index data, so by default the
+        # response models skip pydantic validation on the way out
+        self.validate_responses = validate_responses
         self.search_engines = {}
         self.model = None
         
@@ -93,7 +97,18 @@ class SearchService:
         if not self.app:
             return
             
-        @self.app.post("/search", response_model=SearchResponse)
+        if self.validate_responses:
+            search_route = self.app.post("/search", response_model=SearchResponse)
+        else:
+            # Keep the schema in the OpenAPI docs without re-validating the
+            # response model on every request
+            search_route = self.app.post(
+                "/search",
+                response_model=None,
+                responses={200: {"model": SearchResponse}}
+            )
+        
+        @search_route
         async def search(request: SearchRequest):
             return await self._handle_search(request)
         
@@ -182,7 +197,8 @@ class SearchService:
         
         # Format response
         search_results = [
-            SearchResult(
+            self._build_model(
+                SearchResult,
                 content=result['content'],
                 score=result['score'],
                 metadata=result['metadata']
@@ -190,7 +206,8 @@ class SearchService:
             for result in results
         ]
         
-        return SearchResponse(
+        return self._build_model(
+            SearchResponse,
             results=search_results,
             query_analysis={
                 'original_query': request.query,
@@ -200,6 +217,12 @@ class SearchService:
             }
         )
     
+    def _build_model(self, model_class: type, **data: Any) -> Any:
+        """Build a response model, skipping validation unless validate_responses is set"""
+        if not self.validate_responses and hasattr(model_class, 'model_construct'):
+            return model_class.model_construct(**data)
+        return model_class(**data)
+    
     def search_direct(self, query: str, index_name: str = "default", count: int = 3, 
                      distance: float = 0.0, tags: Optional[List[str]] = None, 
                      language: Optional[str] = None) -> Dict[str, Any]:
@@ -271,6 +271,15 @@ class TestSwaigFunctionResultSerialization:
         assert "action" in result_dict
         assert len(result_dict["action"]) == 1
     
+    def test_to_dict_omits_empty_fields(self):
+        """Test to_dict defaults and omission of unused fields"""
+        assert SwaigFunctionResult().to_dict() == {"response": "Action completed."}
+        assert SwaigFunctionResult("Hi", post_process=True).to_dict() == {"response": "Hi"}
+        
+        action_only = SwaigFunctionResult().add_action("hangup", True)
+        assert action_only.to_dict() == {"action": [{"hangup": True}]}
+        assert list(SwaigFunctionResult("Bye").add_action("hangup", True).to_dict()) == ["response", "action"]
+    
     def test_json_serialization(self):
         """Test JSON serialization"""
         result = SwaigFunctionResult("Hello JSON")
@@ -108,6 +108,21 @@ class TestStructuredLoggerWrapper:
         assert "count=42" in call_args
         assert "enabled=True" in call_args
     
+    def test_disabled_level_skips_formatting(self):
+        """Test that messages for disabled levels are not formatted"""
+        logger = logging.getLogger("test_disabled_level")
+        logger.setLevel(logging.INFO)
+        wrapper = StructuredLoggerWrapper(logger)
+        
+        with patch.object(wrapper, '_format_structured_message', wraps=wrapper._format_structured_message) as fmt, \
+             patch.object(logger, 'debug') as debug:
+            wrapper.debug("debug message", data={"key": "value"})
+            fmt.assert_not_called()
+            debug.assert_not_called()
+            
+            wrapper.info("info message", count=1)
+            fmt.assert_called_once_with("info message", count=1)
+    
     def test_attribute_delegation(self):
         """Test that other attributes are delegated to underlying logger"""
         mock_logger = Mock()
@@ -217,6 +217,60 @@ class TestSessionManager:
         
         assert manager.set_session_metadata("call_123", "key", "value") is True
 
+    def test_validate_token_uses_cache(self):
+        """Test that repeated validations are answered from the cache"""
+        manager = SessionManager()
+        token = manager.generate_token("test_function", "call_123")
+
+        assert manager.validate_token("call_123", "test_function", token) is True
+        assert manager.validate_token("other_call", "test_function", token) is False
+
+        with patch.object(manager, '_check_token') as mock_check:
+            assert manager.validate_token("call_123", "test_function", token) is True
+            assert manager.validate_token("other_call", "test_function", token) is False
+            mock_check.assert_not_called()
+
+    def test_validate_token_cache_respects_expiry(self):
+        """Test that a cached success does not outlive the token"""
+        manager = SessionManager(token_expiry_secs=3600)
+        token = manager.generate_token("test_function", "call_123")
+
+        assert manager.validate_token("call_123", "test_function", token) is True
+
+        with patch('time.time', return_value=time.time() + 7200):
+            assert manager.validate_token("call_123", "test_function", token) is False
+
+    def test_validate_token_cache_is_bounded(self):
+        """Test that the validation cache does not grow without bound"""
+        manager = SessionManager()
+        manager.TOKEN_CACHE_SIZE = 10
+
+        for i in range(25):
+            manager.validate_token(f"call_{i}", "test_function", "invalid_token")
+
+        assert len(manager._token_cache) == 10
+
+    def test_generate_tokens_batch(self):
+        """Test generating tokens for several functions of one call at once"""
+        manager = SessionManager()
+        tokens = manager.generate_tokens(["lookup", "post_prompt"], "call_123")
+
+        assert set(tokens) == {"lookup", "post_prompt"}
+        assert manager.validate_token("call_123", "lookup", tokens["lookup"]) is True
+        assert manager.validate_token("call_123", "post_prompt", tokens["post_prompt"]) is True
+        assert manager.validate_token("call_123", "post_prompt", tokens["lookup"]) is False
+
+    def test_signature_follows_secret_key_change(self):
+        """Test that replacing secret_key invalidates tokens signed with the old key"""
+        manager = SessionManager(secret_key="a" * 32)
+        token = manager.generate_token("test_function", "call_123")
+        assert manager._check_token("call_123", "test_function", token)[0] is True
+
+        manager.secret_key = "b" * 32
+        assert manager._check_token("call_123", "test_function", token)[0] is False
+        new_token = manager.generate_token("test_function", "call_123")
+        assert manager._check_token("call_123", "test_function", new_token)[0] is True
+
 
 class TestSessionManagerErrorHandling:
     """Test error handling in SessionManager"""
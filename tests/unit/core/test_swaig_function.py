@@ -399,4 +399,21 @@ class TestSWAIGFunctionIntegration:
         
         # Should be deserializable
         parsed = json.loads(json_str)
-        assert parsed["function"] == "json_function" 
\ No newline at end of file
+        assert parsed["function"] == "json_function"
+    
+    def test_fields_are_slots(self):
+        """Test that SWAIGFunction keeps its fields in slots, without an instance dict"""
+        import weakref
+        func = SWAIGFunction(
+            name="slotted_function",
+            handler=lambda args, raw_data: None,
+            description="Slotted function"
+        )
+        
+        assert not hasattr(func, "__dict__")
+        assert func.is_external is False
+        assert func._is_async is False
+        assert weakref.ref(func)() is func
+        
+        with pytest.raises(AttributeError):
+            func.custom_tag = "billing"